@@ -122,6 +122,172 @@ def get_number_fires(distribution: dict):
     return 0
 
 
+# The 2-bit codes of the packed forest states: the code of a state key is its index in this string
+PACKED_STATE_CHARS = "TFBD"
+# Lookup table of each byte value to the 4 state keys it packs (the first cell is in the lowest 2 bits)
+PACKED_BYTE_TO_CHARS = tuple("".join(PACKED_STATE_CHARS[(byte >> (2 * i)) & 3] for i in range(4))
+                             for byte in range(256))
+# Lookup tables (one per state key) of each byte value to the number of cells of that state it packs
+PACKED_COUNT_TABLES = {char: bytes(sum(((byte >> (2 * i)) & 3) == code for i in range(4)) for byte in range(256))
+                       for code, char in enumerate(PACKED_STATE_CHARS)}
+
+
+class PackedForestState:
+    """
+    A compact snapshot of the Forest that stores each ForestCell as a 2-bit code (4 cells per byte) instead of
+    a 2D List of 1-character strings. The codes are the index of the state key in PACKED_STATE_CHARS. Cells are
+    packed row by row; the unused bits of the last byte are 0 (padding).
+    Produced by ForestFireSim.packed_repr_forest and converted back to the 2D List form only on request.
+    """
+    length: int
+    number_of_cells: int
+    data: bytearray
+
+    def __init__(self, length: int, data=None):
+        """
+        :param length: int; length of the Forest grid.
+        :param data: bytearray; the packed cells. None -> all cells set to code 0.
+        """
+        self.length = int(length)
+        self.number_of_cells = self.length * self.length
+        if data is None:
+            data = bytearray((self.number_of_cells + 3) // 4)
+        self.data = data
+
+    def to_string(self):
+        """
+        Unpacks the cells into a single string of state keys (row by row) using the byte lookup table.
+        :return: str; the state keys of all cells.
+        """
+        return "".join(map(PACKED_BYTE_TO_CHARS.__getitem__, self.data))[:self.number_of_cells]
+
+    def to_str_list(self):
+        """
+        Unpacks the cells into the 2D List form of ForestFireSim.str_list_repr_forest.
+        :return: list; 2D List containing the state keys ('T', 'F', 'B', 'D').
+        """
+        cells = self.to_string()
+        return [list(cells[i:i + self.length]) for i in range(0, self.number_of_cells, self.length)]
+
+    def count_elem(self, elem: str):
+        """
+        Counts the number of cells with the given state key using the per-byte lookup tables.
+        :param elem: str; the key of the agent type.
+        :return: int; number of cells with that state key (0 for an unknown key).
+        """
+        count_table = PACKED_COUNT_TABLES.get(elem)
+        if count_table is None:
+            return 0
+        count = sum(self.data.translate(count_table))
+        if elem == PACKED_STATE_CHARS[0]:
+            # remove the padding cells of the last byte
+            count -= len(self.data) * 4 - self.number_of_cells
+        return count
+
+
+class RingBuffer:
+    """
+    A preallocated, fixed-capacity buffer that keeps the most recent items appended to it. Used by the
+    ForestHistory to retain only the last N frames/statistics of long-running simulations so memory stays
+    flat. The storage has one more slot than the capacity: the extra slot is the one the next append will
+    write to and may hold 1 item evicted earlier, so callers can recycle that item (see spare()). Every other
+    slot outside the buffer is emptied, so evicted items are not kept alive.
+    If the buffer is growable, it doubles its storage when full instead of evicting the oldest item.
+    """
+    capacity: int
+    growable: bool
+    storage: list
+    head: int
+    size: int
+
+    def __init__(self, capacity: int, growable=False):
+        """
+        :param capacity: int; the maximum number of items retained (must be at least 1).
+        :param growable: bool; True -> double the capacity when full; False -> evict the oldest item when full.
+        """
+        if int(capacity) < 1:
+            raise ValueError("The RingBuffer capacity must be an integer of at least 1.")
+        self.capacity = int(capacity)
+        self.growable = bool(growable)
+        self.storage = [None] * (self.capacity + 1)
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("RingBuffer index out of range")
+        return self.storage[(self.head + index) % len(self.storage)]
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield self.storage[(self.head + i) % len(self.storage)]
+
+    def spare(self):
+        """
+        Returns the stale item sitting in the slot the next append will write to (an item evicted earlier),
+        or None if that slot was never used. The item is no longer part of the buffer and may be reused.
+        :return: the stale item or None
+        """
+        return self.storage[(self.head + self.size) % len(self.storage)]
+
+    def append(self, item):
+        """
+        Appends the item as the newest entry. If the buffer is full, either grows (growable) or evicts
+        the oldest item. The evicted item stays in its slot, which becomes the next spare() slot.
+        :param item: the item to store.
+        :return: the evicted item, or None if nothing was evicted.
+        """
+        evicted = None
+        if self.size == self.capacity:
+            if self.growable:
+                self.grow()
+            else:
+                evicted = self.storage[self.head]
+                self.head = (self.head + 1) % len(self.storage)
+                self.size -= 1
+        self.storage[(self.head + self.size) % len(self.storage)] = item
+        self.size += 1
+        return evicted
+
+    def pop_oldest(self):
+        """
+        Removes the oldest item from the buffer and empties its slot. If the spare() slot is empty, the item is
+        moved there so it can still be recycled.
+        :return: the oldest item
+        """
+        if self.size == 0:
+            raise IndexError("pop from an empty RingBuffer")
+        item = self.storage[self.head]
+        self.storage[self.head] = None
+        self.head = (self.head + 1) % len(self.storage)
+        self.size -= 1
+        spare_index = (self.head + self.size) % len(self.storage)
+        if self.storage[spare_index] is None:
+            self.storage[spare_index] = item
+        return item
+
+    def grow(self):
+        """
+        Doubles the capacity, keeping the items in order (the spare() item is dropped).
+        :return: None
+        """
+        items = self.to_list()
+        self.capacity *= 2
+        self.storage = items + [None] * (self.capacity + 1 - len(items))
+        self.head = 0
+
+    def to_list(self):
+        """
+        :return: list; the items from oldest to newest.
+        """
+        return list(self)
+
+
 class ForestCellHistory:
     """
     The Class object collecting the history and data of the individual ForestCell
@@ -199,20 +365,55 @@ class ForestHistory:
     number_of_fire_iterations: list
     number_burnt_cells: list
     number_foliage_cells: list
+    fire_statistic_growth_iterations: list
+    max_frames: int
+    max_growth_iterations: int
+    retained_growth_frames: int
+    packed_states: bool
+    packed_codes: dict
 
     def __init__(self, length: int, agent_history: bool, foliage_growth_rate: float, fire_start_dist: dict,
-                 fire_spread_chance: float):
+                 fire_spread_chance: float, max_frames=None, max_growth_iterations=None, packed_states=False):
         """
         Takes the parameters for the ForestFireSim and saves as 'metadata' within the history and collection
         of data gathered from simulation of ABM. Other metadata to track is the number of growth_iterations
         and number_of_fires that have occurred.
+
+        For long-running simulations, the forest states and statistics can be limited to a retention window.
+        The window keeps the last max_frames forest states and/or the forest states of the last
+        max_growth_iterations growth iterations (including the fire iterations leading up to them) in a
+        preallocated RingBuffer. With max_frames, the buffer has a fixed size and appending a state does not
+        allocate; if max_growth_iterations is also given, the smaller window of the 2 applies.
+        With only max_growth_iterations, the window always holds the last max_growth_iterations growth
+        iterations, however long their fires are. The buffer starts with room for
+        max_growth_iterations * (2 * length + 2) states and doubles whenever a window is longer than any seen
+        before, so it is not allocation-free until it has seen the longest fires of the run. Only the states in
+        the window (plus 1 recycled state) are kept.
+        The statistics follow the growth states in the window: 'number_of_foliage_cells' has 1 entry per
+        retained growth state, and 'number_of_fire_iterations'/'number_burnt_cells' have 1 entry per fire that
+        ended in a retained growth iteration. When a growth state is evicted, its statistics are evicted too.
+        The metadata counts ('number_of_fires', 'number_of_growth_iterations') stay exact.
+
+        The forest states can also be stored as PackedForestState objects (2 bits per ForestCell) and are only
+        converted to the 2D List form by get_dict_forest_history.
         :param length: int; length of Forest grid
         :param agent_history: bool; whether to track individual agent history.
         :param foliage_growth_rate: dict; the probability of foliage spawning depending on neighboring
             ForestCells having foliage themselves.
         :param fire_start_dist: dict; CDF that dictates the number of fires that are created per growth iteration.
         :param fire_spread_chance: float; the probability that fire spreads to the neighboring ForestCell.
-        """
+        :param max_frames: int; the number of most recent forest states to keep. None -> no limit.
+        :param max_growth_iterations: int; the number of most recent growth iterations to keep forest states
+            for. None -> no limit.
+        :param packed_states: bool; True -> forest states are PackedForestState objects; False -> 2D Lists.
+        """
+        if max_frames is not None and int(max_frames) < 1:
+            raise ValueError("The max_frames must be an integer of at least 1.")
+        if max_growth_iterations is not None and int(max_growth_iterations) < 1:
+            raise ValueError("The max_growth_iterations must be an integer of at least 1.")
+        self.max_frames = None if max_frames is None else int(max_frames)
+        self.max_growth_iterations = None if max_growth_iterations is None else int(max_growth_iterations)
+        self.retained_growth_frames = 0
         self.metadata = {'number_of_fires': 0, 'number_of_growth_iterations': 0,
                          "hyper-parameters": {
                              "length": length,
@@ -227,10 +428,54 @@ class ForestHistory:
                              "Burnt": "B",
                              "Dirt": "D",
                          }}
-        self.forest_states = []
-        self.number_burnt_cells = []
-        self.number_of_fire_iterations = []
-        self.number_foliage_cells = []
+        if self.is_bounded():
+            self.metadata["history_retention"] = {
+                "max_frames": self.max_frames,
+                "max_growth_iterations": self.max_growth_iterations,
+            }
+        self.packed_states = bool(packed_states)
+        # the 2-bit code of each agent type for the PackedForestState
+        self.packed_codes = {agent_type: PACKED_STATE_CHARS.index(char)
+                             for agent_type, char in self.metadata['key'].items()}
+        if self.is_bounded():
+            max_growth_states = min(x for x in (self.max_frames, self.max_growth_iterations) if x is not None)
+            if self.max_frames is not None:
+                self.forest_states = RingBuffer(self.max_frames)
+            else:
+                # 1 growth state plus the fire states before it; the fire rarely needs more than 2 * length
+                # iterations, and the buffer grows if it does
+                self.forest_states = RingBuffer(self.max_growth_iterations * (2 * int(length) + 2), growable=True)
+            self.number_foliage_cells = RingBuffer(max_growth_states)
+            # a fire statistic is saved just before its growth state, so it may briefly exceed the window by 1
+            self.number_burnt_cells = RingBuffer(max_growth_states + 1)
+            self.number_of_fire_iterations = RingBuffer(max_growth_states + 1)
+            self.fire_statistic_growth_iterations = RingBuffer(max_growth_states + 1)
+        else:
+            self.forest_states = []
+            self.number_burnt_cells = []
+            self.number_of_fire_iterations = []
+            self.number_foliage_cells = []
+            self.fire_statistic_growth_iterations = []
+
+    def is_bounded(self):
+        """
+        :return: bool; True -> the history keeps a retention window; False -> the history keeps everything.
+        """
+        return self.max_frames is not None or self.max_growth_iterations is not None
+
+    def recycled_state(self):
+        """
+        Returns the forest state (2D List or PackedForestState) that fell out of the retention window and will be
+        overwritten by the next update_history() call. Filling it in place (see ForestFireSim.history_repr_forest)
+        avoids allocating a new forest state for every frame.
+        :return: list or PackedForestState; the stale forest state, or None if there is none to reuse.
+        """
+        if not self.is_bounded():
+            return None
+        spare = self.forest_states.spare()
+        if spare is None:
+            return None
+        return spare['state']
 
     def update_history(self, iter_type: str, iter_num: int, forest_representation: list):
         """
@@ -246,24 +491,74 @@ class ForestHistory:
             # check if fire statistics update needed first
             if len(self.forest_states) > 0 and self.forest_states[-1]['iteration_type'].lower() == 'fire':
                 self.update_new_fire_statistic()
+                self.fire_statistic_growth_iterations.append(int(iter_num))
             self.metadata['number_of_growth_iterations'] = iter_num
-        new_entry = {
-            "iteration_type": str(iter_type),
-            "iteration_number": str(iter_num),
-            "state": forest_representation
-        }
-        self.forest_states.append(new_entry)
+        if self.is_bounded():
+            self.append_bounded_entry(iter_type, iter_num, forest_representation)
+        else:
+            new_entry = {
+                "iteration_type": str(iter_type),
+                "iteration_number": str(iter_num),
+                "state": forest_representation
+            }
+            self.forest_states.append(new_entry)
         if iter_type.lower() == 'growth':
             # after saving the Forest World to history, use it to update the growth statistics
             self.update_growth_statistics()
 
+    def append_bounded_entry(self, iter_type: str, iter_num: int, forest_representation: list):
+        """
+        Appends the forest state to the RingBuffer, reusing the entry that fell out of the window, and then
+        evicts the forest states older than the last max_growth_iterations growth iterations. The statistics of
+        every evicted growth state are evicted with it.
+        :param iter_type: str; the type of iteration ('fire' or 'growth').
+        :param iter_num: int; the number of the iteration.
+        :param forest_representation: list; the 2D List forest state.
+        :return: None
+        """
+        entry = self.forest_states.spare()
+        if entry is None:
+            entry = {}
+        entry["iteration_type"] = str(iter_type)
+        entry["iteration_number"] = str(iter_num)
+        entry["state"] = forest_representation
+        evicted = self.forest_states.append(entry)
+        if evicted is not None:
+            self.evict_growth_statistics(evicted)
+        if iter_type.lower() == 'growth':
+            self.retained_growth_frames += 1
+            if self.max_growth_iterations is not None:
+                # the fire states after the evicted growth state belong to the next (retained) growth iteration
+                while self.retained_growth_frames > self.max_growth_iterations:
+                    self.evict_growth_statistics(self.forest_states.pop_oldest())
+
+    def evict_growth_statistics(self, evicted_entry: dict):
+        """
+        If the evicted forest state is a growth state, evicts its foliage statistic and the fire statistics of
+        its growth iteration (and any older ones) so the statistics cover the same window as the forest states.
+        :param evicted_entry: dict; the forest state entry that fell out of the window.
+        :return: None
+        """
+        if evicted_entry['iteration_type'].lower() != 'growth':
+            return
+        self.retained_growth_frames -= 1
+        self.number_foliage_cells.pop_oldest()
+        growth_iteration = int(evicted_entry['iteration_number'])
+        while len(self.fire_statistic_growth_iterations) > 0 and \
+                self.fire_statistic_growth_iterations[0] <= growth_iteration:
+            self.fire_statistic_growth_iterations.pop_oldest()
+            self.number_of_fire_iterations.pop_oldest()
+            self.number_burnt_cells.pop_oldest()
+
     def count_elem(self, elem: str):
         """
         Counts the number of occurrences of the given elem (key of agent_type)
         :param elem: str; the key of the agent type.
         :return: number of times that agent type occurred
         """
-        return [x for row in self.forest_states[-1]['state'] for x in row].count(elem)
+        if self.packed_states:
+            return self.forest_states[-1]['state'].count_elem(elem)
+        return sum(row.count(elem) for row in self.forest_states[-1]['state'])
 
     def update_new_fire_statistic(self):
         """
@@ -290,14 +585,30 @@ class ForestHistory:
     def get_dict_forest_history(self):
         """
         Return the metadata and forest states as a JSON-esque response object (Python dictionary).
+        If the history is bounded, only the retention window is returned, copied so that later frames
+        recycling the buffer do not alter the returned forest states. Packed forest states are unpacked.
         :return: dict; the dictionary of metadata and all forest states for the model.
         """
+        if self.packed_states:
+            forest_states = [{
+                "iteration_type": entry["iteration_type"],
+                "iteration_number": entry["iteration_number"],
+                "state": entry["state"].to_str_list()
+            } for entry in self.forest_states]
+        elif self.is_bounded():
+            forest_states = [{
+                "iteration_type": entry["iteration_type"],
+                "iteration_number": entry["iteration_number"],
+                "state": [list(row) for row in entry["state"]]
+            } for entry in self.forest_states]
+        else:
+            forest_states = self.forest_states
         history = {
             'metadata': self.metadata,
-            'number_of_foliage_cells': self.number_foliage_cells,
-            'number_of_fire_iterations': self.number_of_fire_iterations,
-            'number_burnt_cells': self.number_burnt_cells,
-            'forest': self.forest_states
+            'number_of_foliage_cells': list(self.number_foliage_cells),
+            'number_of_fire_iterations': list(self.number_of_fire_iterations),
+            'number_burnt_cells': list(self.number_burnt_cells),
+            'forest': forest_states
         }
         return history
 
@@ -403,6 +714,10 @@ class ForestFireSim:
         Metadata components like number of fires started, and the hyper-parameters that were set at initialization.
     9. agent_history: bool; whether to track the history of individual agents. Good for data collection for
         data analysis. However, this does add more time and memory requirements.
+    10. max_history_frames / max_history_growth_iterations: int; optional retention window for the history. Use
+        these for long-running simulations so the history only keeps the most recent forest states.
+    11. packed_history: bool; whether the history stores the forest states as PackedForestState (2 bits per
+        Forest Cell) rather than 2D Lists of strings. Saves a lot of memory for large forests or long runs.
 
 
     Hyper-Parameters:
@@ -425,7 +740,8 @@ class ForestFireSim:
     agent_history: bool
 
     def __init__(self, length=20, fire_spread_chance=0.50, foliage_growth_rate=0.05, fire_start_dist=None,
-                 agent_history=False, is_print=False):
+                 agent_history=False, is_print=False, max_history_frames=None, max_history_growth_iterations=None,
+                 packed_history=False):
         """
         :param length: int; Hyper-Parameter; the length of the discrete space for the Forest.
         :param fire_spread_chance: float; Hyper-Parameter; the percent that fire will spread to neighboring
@@ -436,6 +752,10 @@ class ForestFireSim:
             iteration.
         :param agent_history: bool; whether to store the individual Forest Cell agent's data overtime.
         :param is_print: bool; whether to print results as we go to the CMD Line.
+        :param max_history_frames: int; the number of most recent forest states the history keeps. None -> all.
+        :param max_history_growth_iterations: int; the number of most recent growth iterations the history keeps
+            forest states for. None -> all.
+        :param packed_history: bool; whether the history stores the forest states as PackedForestState objects.
         """
         ################################################################
         # Instantiate the Hyper-Parameters
@@ -471,8 +791,11 @@ class ForestFireSim:
         self.forest = []
         self.create_forest()
         self.history = ForestHistory(self.length, self.agent_history, self.foliage_growth_rate,
-                                     self.fire_start_dist, self.fire_spread_chance)
-        self.history.update_history('growth', 0, self.str_list_repr_forest())
+                                     self.fire_start_dist, self.fire_spread_chance,
+                                     max_frames=max_history_frames,
+                                     max_growth_iterations=max_history_growth_iterations,
+                                     packed_states=packed_history)
+        self.history.update_history('growth', 0, self.history_repr_forest())
         if self.is_print:
             self.display_board(caption="The __init__ Function Forest Created...")
 
@@ -508,7 +831,7 @@ class ForestFireSim:
         """
         self.simulate_fires()
         self.simulate_foliage_growth()
-        self.history.update_history('growth', self.growth_iterations, self.str_list_repr_forest())
+        self.history.update_history('growth', self.growth_iterations, self.history_repr_forest())
         self.burnt_to_dirt()
         if self.is_print:
             self.display_board(caption=f'After Growth Iteration Number: {self.growth_iterations}')
@@ -548,7 +871,7 @@ class ForestFireSim:
                         new_fire_locations.append(cell)
             # Now set this Fire Cell to dirt
             self.forest[fire_cell_location[0]][fire_cell_location[1]].set_to_burnt_down(fire_counter)
-        self.history.update_history('fire', fire_counter, self.str_list_repr_forest())
+        self.history.update_history('fire', fire_counter, self.history_repr_forest())
         if self.is_print:
             self.display_board(caption=f'Fire Iteration #{fire_counter}')
         if len(new_fire_locations) > 0:
@@ -572,7 +895,7 @@ class ForestFireSim:
         """
         fire_locations = self.start_fires()
         if len(fire_locations) > 0:
-            self.history.update_history('fire', 0, self.str_list_repr_forest())
+            self.history.update_history('fire', 0, self.history_repr_forest())
             if self.is_print:
                 self.display_board(caption=f'Fire Iteration #0')
             self.burn_off_fires(fire_locations, fire_counter=1)
@@ -631,13 +954,58 @@ class ForestFireSim:
         print(string_board + "\n")
         return string_board
 
-    def str_list_repr_forest(self):
+    def history_repr_forest(self):
+        """
+        Creates the representation of the Forest to save in the history: either a PackedForestState or a 2D List
+        depending on the history. Reuses the forest state recycled by the history if there is one.
+        :return: PackedForestState or list; the representation of the current Forest.
+        """
+        if self.history.packed_states:
+            return self.packed_repr_forest(self.history.recycled_state())
+        return self.str_list_repr_forest(self.history.recycled_state())
+
+    def packed_repr_forest(self, packed_forest=None):
+        """
+        Packs the Forest straight into a PackedForestState (2 bits per Forest Cell, 4 cells per byte).
+        :param packed_forest: PackedForestState; optional state (from ForestHistory.recycled_state) to fill in
+            place instead of creating a new one.
+        :return: PackedForestState; the packed representation of the current Forest.
+        """
+        if packed_forest is None:
+            packed_forest = PackedForestState(self.length)
+        data = packed_forest.data
+        codes = self.history.packed_codes
+        byte = 0
+        shift = 0
+        index = 0
+        for row in self.forest:
+            for elem in row:
+                byte |= codes[elem.agent_type] << shift
+                shift += 2
+                if shift == 8:
+                    data[index] = byte
+                    index += 1
+                    byte = 0
+                    shift = 0
+        if shift > 0:
+            data[index] = byte
+        return packed_forest
+
+    def str_list_repr_forest(self, char_forest=None):
         """
         This is use to store the history of the Forest.
         This will be used to analyze and for frontend consumption.
+        :param char_forest: list; optional 2D List (from ForestHistory.recycled_state) to fill in place instead
+            of creating a new one.
         :return: list; char_forest ... 2D List containing the strings that are allowed
             ('T' for Foliage/Tree, 'F' for Fire, 'D' for Dirt, 'B' for Burnt)
         """
+        if char_forest is not None:
+            key = self.history.metadata['key']
+            for row, char_row in zip(self.forest, char_forest):
+                for j, elem in enumerate(row):
+                    char_row[j] = key[elem.agent_type]
+            return char_forest
         char_forest = []
         for row in self.forest:
             new_row = []
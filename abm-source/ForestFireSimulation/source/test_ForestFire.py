@@ -0,0 +1,245 @@
+import random
+import unittest
+
+from ForestFire import ForestFireSim, ForestHistory, PackedForestState, RingBuffer
+
+
+def run_simulation(seed: int, iterations: int, **kwargs):
+    """
+    Runs a ForestFireSim with a fixed seed and returns its dictionary history.
+    """
+    random.seed(seed)
+    fire_sim = ForestFireSim(**kwargs)
+    fire_sim.simulate_for_n_iterations(iterations)
+    return fire_sim, fire_sim.history.get_dict_forest_history()
+
+
+def statistics_by_growth_iteration(history: dict):
+    """
+    Maps the statistics of an unbounded dictionary history to the growth iteration they belong to.
+    :return: tuple; dict of growth iteration -> foliage count, list of (growth iteration, fire iterations, burnt)
+    """
+    foliage = {}
+    fires = []
+    pending_fire = False
+    for entry in history['forest']:
+        if entry['iteration_type'] == 'fire':
+            pending_fire = True
+            continue
+        growth_iteration = int(entry['iteration_number'])
+        foliage[growth_iteration] = history['number_of_foliage_cells'][len(foliage)]
+        if pending_fire:
+            fires.append((growth_iteration, history['number_of_fire_iterations'][len(fires)],
+                          history['number_burnt_cells'][len(fires)]))
+            pending_fire = False
+    return foliage, fires
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_wrap_around_keeps_newest_in_order(self):
+        ring = RingBuffer(3)
+        evicted = [ring.append(i) for i in range(7)]
+        self.assertEqual(ring.to_list(), [4, 5, 6])
+        self.assertEqual(evicted, [None, None, None, 0, 1, 2, 3])
+        self.assertEqual(ring[0], 4)
+        self.assertEqual(ring[-1], 6)
+        with self.assertRaises(IndexError):
+            ring[3]
+
+    def test_spare_returns_evicted_item(self):
+        ring = RingBuffer(2)
+        self.assertIsNone(ring.spare())
+        ring.append('a')
+        ring.append('b')
+        self.assertIsNone(ring.spare())
+        ring.append('c')
+        self.assertEqual(ring.spare(), 'a')
+
+    def test_pop_oldest_then_spare(self):
+        ring = RingBuffer(3)
+        for item in 'abcd':
+            ring.append(item)
+        self.assertEqual(ring.pop_oldest(), 'b')
+        self.assertEqual(ring.to_list(), ['c', 'd'])
+        # the next write goes to the slot of 'a'; the slot of 'b' is emptied so only 1 stale item is kept
+        self.assertEqual(ring.spare(), 'a')
+        self.assertEqual(sum(item is not None for item in ring.storage), 3)
+        ring.append('e')
+        self.assertIsNone(ring.spare())
+        self.assertEqual(ring.to_list(), ['c', 'd', 'e'])
+
+    def test_pop_oldest_moves_item_to_empty_spare_slot(self):
+        ring = RingBuffer(3)
+        for item in 'abc':
+            ring.append(item)
+        self.assertEqual(ring.pop_oldest(), 'a')
+        self.assertEqual(ring.pop_oldest(), 'b')
+        self.assertEqual(ring.spare(), 'a')
+        self.assertEqual(sum(item is not None for item in ring.storage), 2)
+
+    def test_growable_keeps_items_in_order(self):
+        ring = RingBuffer(2, growable=True)
+        for item in 'abc':
+            ring.append(item)
+        ring.pop_oldest()
+        for item in 'defg':
+            self.assertIsNone(ring.append(item))
+        self.assertEqual(ring.to_list(), ['b', 'c', 'd', 'e', 'f', 'g'])
+        self.assertEqual(ring.capacity, 8)
+
+    def test_capacity_of_one(self):
+        ring = RingBuffer(1)
+        ring.append('a')
+        self.assertEqual(ring.append('b'), 'a')
+        self.assertEqual(ring.to_list(), ['b'])
+        self.assertEqual(ring.spare(), 'a')
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+
+class TestBoundedForestHistory(unittest.TestCase):
+    retention_settings = [
+        {'max_history_frames': 1},
+        {'max_history_frames': 4},
+        {'max_history_frames': 25},
+        {'max_history_growth_iterations': 1},
+        {'max_history_growth_iterations': 3},
+        {'max_history_frames': 40, 'max_history_growth_iterations': 10},
+        {'max_history_frames': 5, 'max_history_growth_iterations': 2},
+    ]
+
+    def test_bounded_history_is_tail_of_unbounded_history(self):
+        for length, seed in ((11, 1), (15, 2)):
+            _, unbounded = run_simulation(seed, 150, length=length, fire_spread_chance=0.6)
+            foliage, fires = statistics_by_growth_iteration(unbounded)
+            for settings in self.retention_settings:
+                with self.subTest(length=length, **settings):
+                    _, bounded = run_simulation(seed, 150, length=length, fire_spread_chance=0.6, **settings)
+                    self.assertEqual(bounded['metadata']['number_of_fires'],
+                                     unbounded['metadata']['number_of_fires'])
+                    self.assertEqual(bounded['metadata']['number_of_growth_iterations'],
+                                     unbounded['metadata']['number_of_growth_iterations'])
+                    number_of_frames = len(bounded['forest'])
+                    self.assertEqual(bounded['forest'], unbounded['forest'][-number_of_frames:])
+
+                    growth_iterations = [int(entry['iteration_number']) for entry in bounded['forest']
+                                         if entry['iteration_type'] == 'growth']
+                    if 'max_history_growth_iterations' in settings:
+                        self.assertLessEqual(len(growth_iterations), settings['max_history_growth_iterations'])
+                    self.assertEqual(bounded['number_of_foliage_cells'], [foliage[g] for g in growth_iterations])
+                    retained_fires = [fire for fire in fires if fire[0] in growth_iterations]
+                    self.assertEqual(bounded['number_of_fire_iterations'], [fire[1] for fire in retained_fires])
+                    self.assertEqual(bounded['number_burnt_cells'], [fire[2] for fire in retained_fires])
+
+    def test_growth_only_retention_keeps_only_the_window(self):
+        for length, max_growth_iterations in ((20, 3), (30, 1)):
+            with self.subTest(length=length, max_growth_iterations=max_growth_iterations):
+                random.seed(4)
+                fire_sim = ForestFireSim(length=length, fire_spread_chance=0.7,
+                                         max_history_growth_iterations=max_growth_iterations)
+                for i in range(1, 601):
+                    fire_sim.simulate_iteration()
+                    forest_states = fire_sim.history.forest_states
+                    growth_states = [entry for entry in forest_states if entry['iteration_type'] == 'growth']
+                    self.assertEqual(len(growth_states), min(i + 1, max_growth_iterations))
+                    self.assertEqual(len(fire_sim.history.number_foliage_cells), len(growth_states))
+                    stored_states = sum(entry is not None for entry in forest_states.storage)
+                    self.assertLessEqual(stored_states, len(forest_states) + 1)
+
+    def test_growth_only_retention_grows_for_long_fires(self):
+        length = 10
+        history = ForestHistory(length, False, 0.05, {1: 1}, 0.5, max_growth_iterations=2)
+        initial_capacity = history.forest_states.capacity
+        state = [['T'] * length for _ in range(length)]
+        history.update_history('growth', 0, state)
+        for growth_iteration in range(1, 6):
+            # each fire is longer than the initial room of the whole window
+            for fire_iteration in range(initial_capacity + 5):
+                history.update_history('fire', fire_iteration, state)
+            history.update_history('growth', growth_iteration, state)
+            growth_states = [int(entry['iteration_number']) for entry in history.forest_states
+                             if entry['iteration_type'] == 'growth']
+            self.assertEqual(growth_states, list(range(max(0, growth_iteration - 1), growth_iteration + 1)))
+            self.assertEqual(len(history.number_of_fire_iterations), min(growth_iteration, 2))
+            stored_states = sum(entry is not None for entry in history.forest_states.storage)
+            self.assertLessEqual(stored_states, len(history.forest_states) + 1)
+        self.assertGreater(history.forest_states.capacity, initial_capacity)
+
+    def test_unbounded_metadata_is_unchanged(self):
+        _, history = run_simulation(4, 5, length=10)
+        self.assertNotIn('history_retention', history['metadata'])
+        _, history = run_simulation(4, 5, length=10, max_history_frames=3)
+        self.assertEqual(history['metadata']['history_retention'],
+                         {'max_frames': 3, 'max_growth_iterations': None})
+
+    def test_returned_history_is_not_recycled(self):
+        fire_sim, history = run_simulation(5, 20, length=10, max_history_frames=2)
+        copied = [[list(row) for row in entry['state']] for entry in history['forest']]
+        fire_sim.simulate_for_n_iterations(20)
+        self.assertEqual([entry['state'] for entry in history['forest']], copied)
+
+    def test_invalid_retention(self):
+        with self.assertRaises(ValueError):
+            ForestFireSim(max_history_frames=0)
+        with self.assertRaises(ValueError):
+            ForestFireSim(max_history_growth_iterations=0)
+
+
+class TestPackedForestState(unittest.TestCase):
+
+    def test_round_trip_with_padding(self):
+        random.seed(6)
+        fire_sim = ForestFireSim(length=11)
+        # 121 cells, so the last byte holds 3 padding cells
+        fire_sim.forest[0][0].set_fire(0)
+        fire_sim.forest[10][10].agent_type = 'Burnt'
+        packed = fire_sim.packed_repr_forest()
+        expected = fire_sim.str_list_repr_forest()
+        self.assertEqual(len(packed.data), 31)
+        self.assertEqual(packed.to_str_list(), expected)
+        self.assertEqual(len(packed.to_string()), 121)
+        for elem in 'TFBD':
+            self.assertEqual(packed.count_elem(elem), sum(row.count(elem) for row in expected))
+
+    def test_all_foliage_padding_is_not_counted(self):
+        packed = PackedForestState(13)
+        self.assertEqual(packed.count_elem('T'), 169)
+        self.assertEqual(packed.count_elem('D'), 0)
+
+    def test_unknown_key_counts_zero(self):
+        for packed_history in (False, True):
+            with self.subTest(packed_history=packed_history):
+                random.seed(7)
+                fire_sim = ForestFireSim(length=10, packed_history=packed_history)
+                self.assertEqual(fire_sim.history.count_elem('X'), 0)
+
+    def test_recycled_state_is_refilled_in_place(self):
+        random.seed(8)
+        fire_sim = ForestFireSim(length=13, max_history_frames=2, packed_history=True)
+        fire_sim.simulate_for_n_iterations(5)
+        recycled = fire_sim.history.recycled_state()
+        self.assertIsInstance(recycled, PackedForestState)
+        data = recycled.data
+        for row in fire_sim.forest:
+            for cell in row:
+                cell.agent_type = 'Dirt'
+        refilled = fire_sim.packed_repr_forest(recycled)
+        self.assertIs(refilled, recycled)
+        self.assertIs(refilled.data, data)
+        self.assertEqual(refilled.to_str_list(), fire_sim.str_list_repr_forest())
+
+    def test_packed_history_matches_legacy_history(self):
+        for length, settings in ((13, {}), (25, {}), (13, {'max_history_frames': 7}),
+                                 (11, {'max_history_growth_iterations': 4})):
+            with self.subTest(length=length, **settings):
+                _, legacy = run_simulation(9, 100, length=length, fire_spread_chance=0.7, **settings)
+                _, packed = run_simulation(9, 100, length=length, fire_spread_chance=0.7, packed_history=True,
+                                           **settings)
+                self.assertEqual(packed, legacy)
+
+
+if __name__ == '__main__':
+    unittest.main()